@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
-import json
+# /// script
+# requires-python = ">=3.9"
+# dependencies = ["cachetools", "httpx[http2]", "orjson"]
+# ///
+import asyncio
 import os
-import random
-from socketserver import BaseServer
+import secrets
 import sys
-import threading
 import time
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from email.parser import BytesParser
 from functools import partial
+from hashlib import blake2b
+from http.client import HTTPMessage, responses
+from urllib.parse import parse_qs
+
+import httpx
+import orjson
+from cachetools import TTLCache
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+from stream_relay import DONE_FRAME, MESSAGE_LEVEL_FIELDS, StreamRelay
 
 MODELS = {
     "glm-4.7": {
@@ -32,19 +46,67 @@ MODEL_ALIASES = {
     "claude-3-haiku": "glm-4.7-flash",
 }
 
-DEFAULT_MODEL = "glm-4.7-flash"
+DEFAULT_MODEL = sys.intern("glm-4.7-flash")
 TIMEOUT = 120
+DEFAULT_WORKERS = min(64, (os.cpu_count() or 1) * 8)
+CACHE_MAX_TEMPERATURE = 0.1
+MAX_BODY_SIZE = 4 * 1024 * 1024
+
+KEEPALIVE_EXPIRY = 120
+
+HTTP = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(
+        max_connections=256,
+        max_keepalive_connections=64,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    ),
+    timeout=TIMEOUT,
+)
+# Only used from the event loop thread, so it needs no lock. Identical
+# requests in flight at the same time all miss and all go upstream.
+CACHE = TTLCache(maxsize=1024, ttl=600)
+
+RESOLVE = {sys.intern(k): sys.intern(k) for k in MODELS} | {
+    sys.intern(k): sys.intern(v) for k, v in MODEL_ALIASES.items()
+}
+
+loads = orjson.loads
+
+
+def dumps(obj):
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+log_second = 0
+log_stamp = ""
+
+
+def log_timestamp():
+    global log_second, log_stamp
+    if (now := int(time.time())) != log_second:
+        log_second = now
+        log_stamp = time.strftime("%H:%M:%S", time.localtime(now))
+    return log_stamp
 
 
 def resolve_model(name):
-    if name in MODELS:
-        return name
-    return MODEL_ALIASES.get(name, DEFAULT_MODEL)
+    return RESOLVE.get(name, DEFAULT_MODEL)
+
+
+def cache_key(payload):
+    temperature = payload.get("temperature")
+    if (
+        payload.get("stream")
+        or not isinstance(temperature, (int, float))
+        or temperature > CACHE_MAX_TEMPERATURE
+    ):
+        return None
+    return blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).digest()
 
 
 def make_openai_id():
-    chars = "abcdefghijklmnopqrstuvwxyz0123456789"
-    return f"chatcmpl-{''.join(random.choice(chars) for _ in range(29))}"
+    return f"chatcmpl-{secrets.token_hex(15)[:29]}"
 
 
 def clamp_max_tokens(value, limit):
@@ -66,79 +128,192 @@ def ensure_role(message, default="assistant"):
     return msg_copy
 
 
-MESSAGE_LEVEL_FIELDS = {
-    "tool_calls",
-    "function_call",
-    "reasoning_content",
-    "metadata",
-    "audio",
-    "mcp_calls",
-    "mcp_metadata",
-}
+MODELS_BODY = dumps(
+    {
+        "object": "list",
+        "data": [
+            {
+                "id": m,
+                "object": "model",
+                "created": 1700000000,
+                "owned_by": "zhipuai",
+            }
+            for m in MODELS
+        ],
+    }
+)
+HEALTH_BODY = dumps({"status": "ok", "models": list(MODELS.keys())})
+BUSY_BODY = dumps(
+    {"error": {"message": "Server busy", "type": "api_error", "code": 503}}
+)
+
+CORS_HEADERS = (
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: *\r\n"
+)
+CLOSE_HEADER = b"Connection: close\r\n"
+STREAM_HEADERS = (
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: close\r\n"
+)
+STREAM_FLUSH_BYTES = 16 * 1024
+STREAM_FLUSH_INTERVAL = 0.05
+
+
+class RequestLimiter:
+    def __init__(self, workers):
+        self.slots = asyncio.Semaphore(workers)
+        self.queued = 0
+        self.max_queued = workers * 4
+
+    def saturated(self):
+        return self.queued >= self.max_queued
+
+    async def __aenter__(self):
+        self.queued += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.queued -= 1
+
+    async def __aexit__(self, *exc):
+        self.slots.release()
 
 
-class ProxyHandler(BaseHTTPRequestHandler):
+class ProxyHandler:
     def __init__(
         self,
-        request,
-        client_address,
-        server: BaseServer,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        limiter: RequestLimiter,
         key=None,
     ) -> None:
+        self.reader = reader
+        self.writer = writer
         self.key = key or ""
-        super().__init__(request, client_address, server)
+        self.limiter = limiter
+        self.client_address = writer.get_extra_info("peername")
+        self.requestline = ""
+        self._headers_buffer = []
+        self._pending = bytearray()
+        self._flush_handle = None
 
     def log_message(self, format, *args):
-        ts = time.strftime("%H:%M:%S")
+        ts = log_timestamp()
         msg = format % args if args else format
         print(f"[{ts}] {msg}")
 
-    def handle(self):
+    async def handle(self):
         try:
-            super().handle()
+            if await self.parse_request():
+                method = getattr(self, f"do_{self.command}", None)
+                if method is None:
+                    await self.send_error_json(501, f"Unsupported method {self.command}")
+                else:
+                    await method()
         except ConnectionResetError:
             self.log_message("⚠️ Connection reset by %s", self.client_address)
+        finally:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def parse_request(self):
+        try:
+            head = await self.reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return False
+        except asyncio.LimitOverrunError:
+            await self.send_error_json(431, "Request header fields too large")
+            return False
+        line, _, rest = head.partition(b"\r\n")
+        self.requestline = line.decode("latin-1")
+        parts = self.requestline.split()
+        if len(parts) != 3:
+            await self.send_error_json(400, f"Bad request line {self.requestline!r}")
+            return False
+        self.command, target, self.request_version = parts
+        self.path, _, self.query = target.partition("?")
+        self.headers = BytesParser(_class=HTTPMessage).parsebytes(rest)
+        return True
+
+    def send_response(self, code):
+        self.log_message('"%s" %s -', self.requestline, code)
+        self._headers_buffer = [
+            f"HTTP/1.1 {code} {responses.get(code, '')}\r\n".encode("latin-1")
+        ]
+
+    def send_header(self, keyword, value):
+        self._headers_buffer.append(f"{keyword}: {value}\r\n".encode("latin-1"))
+
+    def send_header_bytes(self, headers):
+        self._headers_buffer.append(headers)
+
+    def end_headers(self, body=b""):
+        self._headers_buffer.append(b"\r\n")
+        self._headers_buffer.append(body)
+        self.writer.write(b"".join(self._headers_buffer))
+        self._headers_buffer = []
 
     def send_cors_headers(self):
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "*")
+        self.send_header_bytes(CORS_HEADERS)
+
+    def write_chunk(self, data):
+        self._pending += data
+        if len(self._pending) >= STREAM_FLUSH_BYTES:
+            self.flush_chunks()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                STREAM_FLUSH_INTERVAL, self.flush_chunks
+            )
+
+    def flush_chunks(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._pending and not self.writer.is_closing():
+            self.writer.write(bytes(self._pending))
+        self._pending.clear()
 
-    def do_OPTIONS(self):
+    async def do_OPTIONS(self):
         self.send_response(200)
+        self.send_header_bytes(b"Content-Length: 0\r\n")
+        self.send_header_bytes(CLOSE_HEADER)
         self.send_cors_headers()
         self.end_headers()
+        await self.writer.drain()
 
-    def do_GET(self):
+    async def do_GET(self):
         if self.path in ("/v1/models", "/models"):
-            data = [
-                {
-                    "id": m,
-                    "object": "model",
-                    "created": 1700000000,
-                    "owned_by": "zhipuai",
-                }
-                for m in MODELS
-            ]
-            self.send_json(200, {"object": "list", "data": data})
+            await self.send_bytes(200, MODELS_BODY, "application/json")
         elif self.path == "/health":
-            self.send_json(200, {"status": "ok", "models": list(MODELS.keys())})
+            await self.send_bytes(200, HEALTH_BODY, "application/json")
         else:
-            self.send_error_json(404, "Not found")
+            await self.send_error_json(404, "Not found")
 
-    def do_POST(self):
+    async def do_POST(self):
         if self.path in ("/v1/chat/completions", "/chat/completions"):
-            self.handle_chat()
+            await self.handle_chat()
         else:
-            self.send_error_json(404, "Not found")
+            await self.send_error_json(404, "Not found")
 
-    def handle_chat(self):
+    async def handle_chat(self):
         try:
-            body = json.loads(
-                self.rfile.read(int(self.headers.get("Content-Length", 0)))
-            )
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return await self.send_error_json(400, "Invalid Content-Length")
+        if length <= 0:
+            return await self.send_error_json(411, "Content-Length required")
+        if length > MAX_BODY_SIZE:
+            return await self.send_error_json(413, "Request body too large")
+        try:
+            body = loads(await self.reader.readexactly(length))
         except Exception as e:
-            return self.send_error_json(400, f"Invalid body: {e}")
+            return await self.send_error_json(400, f"Invalid body: {e}")
 
         requested = body.get("model", DEFAULT_MODEL)
         model = resolve_model(requested)
@@ -148,7 +323,7 @@ class ProxyHandler(BaseHTTPRequestHandler):
         if requested != model:
             self.log_message(f"📎 {requested} → {model}")
 
-        payload = dict(body)
+        payload = body
         payload.setdefault("messages", [])
         if "temperature" not in payload:
             payload["temperature"] = 0.7
@@ -158,112 +333,144 @@ class ProxyHandler(BaseHTTPRequestHandler):
             payload.get("max_tokens"), cfg["max_tokens"]
         )
 
-        data = json.dumps(payload).encode("utf-8")
-        req = Request(cfg["url"], data=data, method="POST")
-        req.add_header("Authorization", f"Bearer {self.key}")
-        req.add_header("Content-Type", "application/json")
+        passthrough = (
+            self.headers.get("X-Proxy-Passthrough") == "1"
+            or "1" in parse_qs(self.query).get("raw", ())
+        )
+        digest = None if passthrough else cache_key(payload)
+        if digest is not None and (cached := CACHE.get(digest)) is not None:
+            self.log_message(f"💾 {model} → cache hit")
+            response = dict(cached)
+            response["id"] = make_openai_id()
+            response["created"] = int(time.time())
+            return await self.send_json(200, response)
+
+        if self.limiter.saturated():
+            self.log_message(f"⏳ {model} → busy")
+            return await self.send_bytes(503, BUSY_BODY, "application/json")
+        async with self.limiter:
+            await self.forward(cfg, model, payload, stream, digest, passthrough)
+
+    async def forward(self, cfg, model, payload, stream, digest, passthrough=False):
+        data = dumps(payload)
+        req = HTTP.build_request(
+            "POST",
+            cfg["url"],
+            content=data,
+            headers={
+                "Authorization": f"Bearer {self.key}",
+                "Content-Type": "application/json",
+            },
+        )
 
         start = time.time()
         try:
-            resp = urlopen(req, timeout=TIMEOUT)
-        except HTTPError as e:
-            err = e.read().decode("utf-8", errors="replace") if e.fp else ""
-            self.log_message(f"❌ ZhipuAI {e.code} ({time.time() - start:.1f}с)")
-            try:
-                msg = json.loads(err).get("error", {}).get("message", err[:500])
-            except Exception:
-                msg = err[:500]
-            return self.send_error_json(e.code, msg)
-        except (URLError, TimeoutError) as e:
-            return self.send_error_json(502, f"Connection error: {e}")
-
-        if stream:
-            self.do_stream(resp, model)
-        else:
-            self.do_normal(resp, model, time.time() - start)
+            resp = await HTTP.send(req, stream=True)
+        except httpx.HTTPError as e:
+            return await self.send_error_json(502, f"Connection error: {e}")
 
-    def do_normal(self, resp, model, elapsed):
         try:
-            result = json.loads(resp.read().decode("utf-8"))
+            if resp.is_error:
+                err = (await resp.aread()).decode("utf-8", errors="replace")
+                self.log_message(
+                    f"❌ ZhipuAI {resp.status_code} ({time.time() - start:.1f}с)"
+                )
+                try:
+                    msg = loads(err).get("error", {}).get("message", err[:500])
+                except Exception:
+                    msg = err[:500]
+                return await self.send_error_json(resp.status_code, msg)
+
+            if passthrough:
+                await self.do_passthrough(resp, model, stream, time.time() - start)
+            elif stream:
+                await self.do_stream(resp, model)
+            else:
+                await self.do_normal(resp, model, time.time() - start, digest)
+        finally:
+            await resp.aclose()
+
+    async def do_normal(self, resp, model, elapsed, digest=None):
+        try:
+            result = loads(await resp.aread())
         except Exception as e:
-            return self.send_error_json(502, f"Invalid response: {e}")
+            return await self.send_error_json(502, f"Invalid response: {e}")
 
         openai_resp = self.normalize_response(result, model)
+        if digest is not None:
+            CACHE[digest] = openai_resp
         usage = openai_resp.get("usage", {})
         self.log_message(
             f"✅ {model} → {usage.get('total_tokens', '?')} tok, {elapsed:.1f}с"
         )
-        self.send_json(200, openai_resp)
+        await self.send_json(200, openai_resp)
+
+    async def do_passthrough(self, resp, model, stream, elapsed):
+        content_type = resp.headers.get("Content-Type", "application/json")
+        if not stream:
+            body = await resp.aread()
+            self.log_message(f"✅ {model} → {len(body)} bytes raw, {elapsed:.1f}с")
+            return await self.send_bytes(200, body, content_type)
+
+        self.send_response(200)
+        self.send_header_bytes(STREAM_HEADERS)
+        self.send_cors_headers()
+        self.end_headers()
+        await self.writer.drain()
+
+        total = 0
+        try:
+            async for data in resp.aiter_bytes():
+                total += len(data)
+                self.write_chunk(data)
+                await self.writer.drain()
+        except Exception as e:
+            self.log_message(f"⚠️ Stream error: {e}")
+        finally:
+            self.flush_chunks()
+            if not self.writer.is_closing():
+                await self.writer.drain()
+        self.log_message(f"{model} → {total} bytes raw")
 
-    def do_stream(self, resp, model):
-        self.close_connection = True
+    async def do_stream(self, resp, model):
         self.send_response(200)
-        self.send_header("Content-Type", "text/event-stream")
-        self.send_header("Cache-Control", "no-cache")
-        self.send_header("Connection", "close")
+        self.send_header_bytes(STREAM_HEADERS)
         self.send_cors_headers()
         self.end_headers()
+        await self.writer.drain()
 
-        chat_id = make_openai_id()
-        total = ""
+        relay = StreamRelay(make_openai_id(), model)
+        total = 0
         done_sent = False
         try:
-            for line in resp:
-                line = line.decode("utf-8").strip()
-                if not line or not line.startswith("data:"):
+            async for line in iter_byte_lines(resp):
+                frame, chars = relay.relay_line(line)
+                if frame is None:
                     continue
-                data_str = line[5:].strip()
-                if data_str == "[DONE]":
-                    self.wfile.write(b"data: [DONE]\n\n")
-                    self.wfile.flush()
+                self.write_chunk(frame)
+                if frame == DONE_FRAME:
                     done_sent = True
                     break
-                try:
-                    chunk = json.loads(data_str)
-                except json.JSONDecodeError:
-                    continue
-                choices = chunk.get("choices", [])
-                normalized_choices = [
-                    self.normalize_stream_choice(choice, idx)
-                    for idx, choice in enumerate(choices)
-                ]
-                total += self.extract_text_from_choices(normalized_choices)
-                oai = {
-                    "id": chunk.get("id", chat_id),
-                    "object": chunk.get("object", "chat.completion.chunk"),
-                    "created": chunk.get("created", int(time.time())),
-                    "model": chunk.get("model", model),
-                    "choices": normalized_choices,
-                }
-                for extra in (
-                    "usage",
-                    "system_fingerprint",
-                    "service_tier",
-                    "metadata",
-                ):
-                    if extra in chunk:
-                        oai[extra] = chunk[extra]
-                self.wfile.write(
-                    f"data: {json.dumps(oai, ensure_ascii=False)}\n\n".encode("utf-8")
-                )
-                self.wfile.flush()
+                total += chars
+                await self.writer.drain()
         except Exception as e:
             self.log_message(f"⚠️ Stream error: {e}")
         finally:
             if not done_sent:
-                self.wfile.write(b"data: [DONE]\n\n")
-                self.wfile.flush()
-        self.log_message(f"{model} → {len(total)} chars")
+                self.write_chunk(DONE_FRAME)
+            self.flush_chunks()
+            if not self.writer.is_closing():
+                await self.writer.drain()
+        self.log_message(f"{model} → {total} chars")
 
-    def normalize_response(self, result, model):
-        response = dict(result)
+    def normalize_response(self, response, model):
         response.setdefault("id", make_openai_id())
         response.setdefault("object", "chat.completion")
         response.setdefault("created", int(time.time()))
         response["model"] = model
         response["choices"] = [
             self.normalize_choice(choice, idx)
-            for idx, choice in enumerate(result.get("choices", []))
+            for idx, choice in enumerate(response.get("choices", []))
         ]
         if not response["choices"]:
             response["choices"].append(
@@ -276,112 +483,96 @@ class ProxyHandler(BaseHTTPRequestHandler):
         return response
 
     def normalize_choice(self, choice, idx):
-        normalized = dict(choice)
-        normalized["index"] = choice.get("index", idx)
-        normalized["finish_reason"] = choice.get("finish_reason")
+        choice.setdefault("index", idx)
         message = choice.get("message")
         if not message and "delta" in choice:
             message = choice["delta"]
-        normalized_message = ensure_role(message or {}, "assistant")
-        if isinstance(normalized_message, dict):
-            normalized_message = dict(normalized_message)
-            for field in MESSAGE_LEVEL_FIELDS:
-                if field in choice and field not in normalized_message:
-                    normalized_message[field] = choice[field]
-        normalized["message"] = normalized_message
-        normalized.pop("delta", None)
-        return {k: v for k, v in normalized.items() if v not in (None, {})}
-
-    def normalize_stream_choice(self, choice, idx):
-        normalized = dict(choice)
-        normalized["index"] = choice.get("index", idx)
-        normalized["finish_reason"] = choice.get("finish_reason")
-        delta = choice.get("delta") or choice.get("message") or {}
-        if isinstance(delta, dict):
-            enriched_delta = dict(delta)
-            for field in MESSAGE_LEVEL_FIELDS:
-                if field in choice and field not in enriched_delta:
-                    enriched_delta[field] = choice[field]
-            delta = enriched_delta
-        if delta:
-            normalized["delta"] = delta
-        normalized.pop("message", None)
-        return {k: v for k, v in normalized.items() if v is not None}
-
-    def extract_text_from_choices(self, choices):
-        total = ""
-        for choice in choices:
-            delta = choice.get("delta", {})
-            content = delta.get("content") if isinstance(delta, dict) else None
-            if isinstance(content, str):
-                total += content
-            elif isinstance(content, list):
-                for block in content:
-                    if isinstance(block, dict):
-                        total += block.get("text", "")
-        return total
-
-    def send_json(self, status, data):
-        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        message = ensure_role(message or {}, "assistant")
+        if isinstance(message, dict):
+            for field in choice.keys() & MESSAGE_LEVEL_FIELDS:
+                message.setdefault(field, choice[field])
+        choice["message"] = message
+        choice.pop("delta", None)
+        for key in [k for k, v in choice.items() if v in (None, {})]:
+            del choice[key]
+        return choice
+
+    async def send_json(self, status, data):
+        await self.send_bytes(status, dumps(data), "application/json")
+
+    async def send_bytes(self, status, body, content_type):
         self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Connection", "close")
+        self.send_header("Content-Type", content_type)
+        self.send_header_bytes(b"Content-Length: %d\r\n" % len(body))
+        self.send_header_bytes(CLOSE_HEADER)
         self.send_cors_headers()
-        self.end_headers()
-        self.wfile.write(body)
-        self.wfile.flush()
-        self.close_connection = True
+        self.end_headers(body)
+        await self.writer.drain()
 
-    def send_error_json(self, status, message):
-        self.send_json(
+    async def send_error_json(self, status, message):
+        await self.send_json(
             status, {"error": {"message": message, "type": "api_error", "code": status}}
         )
 
 
-class ThreadedHTTPServer(HTTPServer):
-    def process_request(self, request, client_address):
-        t = threading.Thread(
-            target=self._handle, args=(request, client_address), daemon=True
-        )
-        t.start()
+async def iter_byte_lines(resp):
+    pending = b""
+    async for data in resp.aiter_bytes():
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
 
-    def _handle(self, request, client_address):
-        try:
-            self.finish_request(request, client_address)
-        except Exception:
-            self.handle_error(request, client_address)
-        finally:
-            self.shutdown_request(request)
 
-    def handle_error(self, request, client_address):
-        exc_type, exc, _ = sys.exc_info()
-        if isinstance(exc, ConnectionResetError):
-            ts = time.strftime("%H:%M:%S")
-            print(f"  [{ts}] ⚠️ Connection reset by {client_address}")
-            return
-        BaseServer.handle_error(self, request, client_address)
+async def handle_connection(reader, writer, limiter, key=None):
+    await ProxyHandler(reader, writer, limiter, key=key).handle()
 
 
-def main():
-    port = 5000
+async def prewarm():
+    urls = {cfg["url"] for cfg in MODELS.values()}
+    await asyncio.gather(*(HTTP.head(url) for url in urls), return_exceptions=True)
+
+
+async def serve(port, key, workers=None):
+    limiter = RequestLimiter(workers or DEFAULT_WORKERS)
+    server = await asyncio.start_server(
+        partial(handle_connection, key=key, limiter=limiter), "0.0.0.0", port
+    )
+    warmup = asyncio.create_task(prewarm())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        warmup.cancel()
+        await HTTP.aclose()
 
-    if "--port" in sys.argv or "-p" in sys.argv:
-        flag = "--port" if "--port" in sys.argv else "-p"
-        idx = sys.argv.index(flag) + 1
-        if idx < len(sys.argv):
-            port = int(sys.argv[idx])
+
+def int_arg(flags, default):
+    for flag in flags:
+        if flag in sys.argv:
+            idx = sys.argv.index(flag) + 1
+            if idx < len(sys.argv):
+                return int(sys.argv[idx])
+    return default
+
+
+def main():
+    port = int_arg(("--port", "-p"), 5000)
+    workers = int_arg(
+        ("--workers", "-w"), int(os.getenv("PROXY_WORKERS") or DEFAULT_WORKERS)
+    )
 
     if (key := os.getenv("ZAI_API_KEY", "")) == "":
         print("set ZAI_API_KEY env")
         sys.exit(1)
 
-    handler = partial(ProxyHandler, key=key)
-    server = ThreadedHTTPServer(("0.0.0.0", port), handler)
     try:
-        server.serve_forever()
+        run = asyncio.run if uvloop is None else uvloop.run
+        run(serve(port, key, workers))
     except KeyboardInterrupt:
-        server.server_close()
+        pass
 
 
 if __name__ == "__main__":
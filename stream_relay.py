@@ -0,0 +1,170 @@
+# SSE relay used by proxy.py's do_stream. Kept in its own typed
+# module so it can be compiled to a C extension with `mypyc stream_relay.py`;
+# the compiled module shadows this file on import, the plain one still works.
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+MESSAGE_LEVEL_FIELDS = frozenset(
+    {
+        "tool_calls",
+        "function_call",
+        "reasoning_content",
+        "metadata",
+        "audio",
+        "mcp_calls",
+        "mcp_metadata",
+    }
+)
+
+OPENAI_CHUNK_FIELDS = {"id", "object", "created", "model", "choices"}
+
+STREAM_EXTRA_FIELDS = ("usage", "system_fingerprint", "service_tier", "metadata")
+
+PASSTHROUGH_CHUNK_FIELDS = OPENAI_CHUNK_FIELDS | set(STREAM_EXTRA_FIELDS)
+
+DONE_FRAME = b"data: [DONE]\n\n"
+
+CONTENT_CHOICE_FIELDS = {"index", "delta", "finish_reason"}
+CONTENT_DELTA_FIELDS = {"role", "content"}
+CONTENT_SUFFIX = b"}]}\n\n"
+
+
+class StreamRelay:
+    def __init__(self, chat_id: str, model: str) -> None:
+        self.chat_id = chat_id
+        self.model = model
+        self.created = int(time.time())
+        self.head: Optional[Tuple[Any, Any, Any, Any]] = None
+        self.prefix = b""
+
+    def relay_line(self, line: bytes) -> Tuple[Optional[bytes], int]:
+        line = line.strip()
+        if not line.startswith(b"data:"):
+            return None, 0
+        data = line[5:].lstrip()
+        if data == b"[DONE]":
+            return DONE_FRAME, 0
+        try:
+            chunk: Dict[str, Any] = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return None, 0
+        choices: List[Any] = chunk.get("choices", [])
+        if is_openai_chunk(chunk, choices):
+            text = extract_text_from_choices(choices)
+            return b"data: " + data + b"\n\n", len(text)
+        if is_content_chunk(chunk, choices):
+            return self.content_frame(chunk, choices[0])
+        normalized_choices = [
+            normalize_stream_choice(choice, idx) for idx, choice in enumerate(choices)
+        ]
+        text = extract_text_from_choices(normalized_choices)
+        oai: Dict[str, Any] = {
+            "id": chunk.get("id", self.chat_id),
+            "object": chunk.get("object", "chat.completion.chunk"),
+            "created": chunk.get("created", self.created),
+            "model": chunk.get("model", self.model),
+            "choices": normalized_choices,
+        }
+        for extra in STREAM_EXTRA_FIELDS:
+            if extra in chunk:
+                oai[extra] = chunk[extra]
+        frame = orjson.dumps(oai, option=orjson.OPT_NON_STR_KEYS)
+        return b"data: " + frame + b"\n\n", len(text)
+
+    def content_frame(
+        self, chunk: Dict[str, Any], choice: Dict[str, Any]
+    ) -> Tuple[bytes, int]:
+        head = (
+            chunk.get("id", self.chat_id),
+            chunk.get("object", "chat.completion.chunk"),
+            chunk.get("created", self.created),
+            chunk.get("model", self.model),
+        )
+        if head != self.head:
+            self.head = head
+            self.prefix = (
+                b'data: {"id":'
+                + orjson.dumps(head[0])
+                + b',"object":'
+                + orjson.dumps(head[1])
+                + b',"created":'
+                + orjson.dumps(head[2])
+                + b',"model":'
+                + orjson.dumps(head[3])
+                + b',"choices":[{"index":0,"delta":{'
+            )
+        delta: Dict[str, Any] = choice["delta"]
+        content: str = delta["content"]
+        frame = self.prefix
+        if "role" in delta:
+            frame += b'"role":' + orjson.dumps(delta["role"]) + b","
+        frame += b'"content":' + orjson.dumps(content) + b"}"
+        finish_reason = choice.get("finish_reason")
+        if finish_reason is None:
+            frame += CONTENT_SUFFIX
+        else:
+            frame += b',"finish_reason":' + orjson.dumps(finish_reason) + CONTENT_SUFFIX
+        return frame, len(content)
+
+
+def is_openai_chunk(chunk: Dict[str, Any], choices: List[Any]) -> bool:
+    keys = chunk.keys()
+    if not OPENAI_CHUNK_FIELDS <= keys or not keys <= PASSTHROUGH_CHUNK_FIELDS:
+        return False
+    return all(
+        isinstance(choice, dict)
+        and "index" in choice
+        and "delta" in choice
+        and "message" not in choice
+        and choice.keys().isdisjoint(MESSAGE_LEVEL_FIELDS)
+        for choice in choices
+    )
+
+
+def is_content_chunk(chunk: Dict[str, Any], choices: List[Any]) -> bool:
+    if len(choices) != 1 or not OPENAI_CHUNK_FIELDS.issuperset(chunk.keys()):
+        return False
+    choice = choices[0]
+    if (
+        not isinstance(choice, dict)
+        or not CONTENT_CHOICE_FIELDS.issuperset(choice.keys())
+        or choice.get("index", 0) != 0
+    ):
+        return False
+    delta = choice.get("delta")
+    return (
+        isinstance(delta, dict)
+        and CONTENT_DELTA_FIELDS.issuperset(delta.keys())
+        and isinstance(delta.get("content"), str)
+    )
+
+
+def normalize_stream_choice(choice: Dict[str, Any], idx: int) -> Dict[str, Any]:
+    normalized = dict(choice)
+    normalized["index"] = choice.get("index", idx)
+    normalized["finish_reason"] = choice.get("finish_reason")
+    delta = choice.get("delta") or choice.get("message") or {}
+    if isinstance(delta, dict) and (present := choice.keys() & MESSAGE_LEVEL_FIELDS):
+        delta = dict(delta)
+        for field in present:
+            delta.setdefault(field, choice[field])
+    if delta:
+        normalized["delta"] = delta
+    normalized.pop("message", None)
+    return {k: v for k, v in normalized.items() if v is not None}
+
+
+def extract_text_from_choices(choices: List[Dict[str, Any]]) -> str:
+    total = ""
+    for choice in choices:
+        delta = choice.get("delta", {})
+        content = delta.get("content") if isinstance(delta, dict) else None
+        if isinstance(content, str):
+            total += content
+        elif isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict):
+                    total += block.get("text", "")
+    return total